@@ -1,4 +1,39 @@
-from .instruments import oscilloscope, list_instruments
-from .model.oscilloscope import Oscilloscope, ScopeChanel, ChannelCoupling, ScopeTrigger, TriggerSlope
-from .model.time import Duration, TimeUnit
-from .model.waveform import Waveform
+from importlib import import_module
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from .instruments import oscilloscope, list_instruments
+    from .model.oscilloscope import Oscilloscope, ScopeChanel, ChannelCoupling, ScopeTrigger, TriggerSlope
+    from .model.time import Duration, DurationArray, TimeUnit
+    from .model.waveform import Waveform
+
+# Public names resolved lazily (PEP 562) on first attribute access. Scripts that only
+# talk to an instrument do not pay for the pyarrow/numpy waveform machinery at import
+# time, and `import inctrl` itself stays nearly free.
+_LAZY_ATTRS = {
+    "oscilloscope": "inctrl.instruments",
+    "list_instruments": "inctrl.instruments",
+    "Oscilloscope": "inctrl.model.oscilloscope",
+    "ScopeChanel": "inctrl.model.oscilloscope",
+    "ChannelCoupling": "inctrl.model.oscilloscope",
+    "ScopeTrigger": "inctrl.model.oscilloscope",
+    "TriggerSlope": "inctrl.model.oscilloscope",
+    "Duration": "inctrl.model.time",
+    "DurationArray": "inctrl.model.time",
+    "TimeUnit": "inctrl.model.time",
+    "Waveform": "inctrl.model.waveform",
+}
+
+
+def __getattr__(name: str):
+    module_name = _LAZY_ATTRS.get(name)
+    if module_name is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(import_module(module_name), name)
+    # Cache on the package so subsequent lookups bypass __getattr__.
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(_LAZY_ATTRS))
@@ -1,9 +1,15 @@
+import numpy as np
 from pyvisa import Resource
 
 
 class CommandDispatcher:
-    def __init__(self, visa_resource: Resource):
+    # Default pyvisa chunk size (20 kB) splits multi-megabyte waveform reads into many small
+    # transfers, each paying its own I/O overhead. Use a much larger chunk for bulk binary reads.
+    DEFAULT_CHUNK_SIZE = 10_000_000
+
+    def __init__(self, visa_resource: Resource, chunk_size: int = DEFAULT_CHUNK_SIZE):
         self.visa_resource = visa_resource
+        self.chunk_size = chunk_size
 
     def read(self, msg: str) -> str:
         self.visa_resource.read(msg).strip()
@@ -13,11 +19,45 @@ class CommandDispatcher:
         if synchronize:
             self.sync()
 
+    def write_many(self, msgs: list[str], synchronize: bool = False) -> None:
+        """
+        Send several SCPI commands as one semicolon-separated compound message, costing a single
+        VISA round-trip instead of one per command. If `synchronize` is True the *OPC? sync is
+        folded into the same message.
+        """
+        payload = ";".join(msgs)
+        if synchronize:
+            self.query(f"{payload};*OPC?")
+        else:
+            self.write(payload)
+
     def query(self, msg: str) -> str:
         return self.visa_resource.query(msg).strip()
 
+    def write_then_query(self, write_msg: str, query_msg: str) -> str:
+        """
+        Send `write_msg`, an *OPC? synchronization point and `query_msg` as one compound
+        SCPI message and return the response to the final query. This collapses the usual
+        write/sync/read-back sequence from three VISA round-trips into one.
+        """
+        return self.query(f"{write_msg};*OPC?;{query_msg}").split(";")[-1].strip()
+
     def query_bytes(self, msg: str) -> bytes:
-        return bytes(self.visa_resource.query_binary_values(msg, datatype = "B"))
+        return bytes(self.visa_resource.query_binary_values(msg, datatype = "B", chunk_size = self.chunk_size))
+
+    def query_binary_array(self, msg: str, datatype: str = "h") -> np.ndarray:
+        """
+        Query a binary block response and return it directly as a numpy array, skipping the
+        intermediate bytes copy made by query_bytes(). `datatype` is a struct format character,
+        e.g. "h" for int16 or "b" for int8 samples.
+        """
+        return self.visa_resource.query_binary_values(
+            msg,
+            datatype = datatype,
+            is_big_endian = False,
+            container = np.ndarray,
+            chunk_size = self.chunk_size
+        )
 
     def sync(self) -> None:
         self.query("*OPC?")
@@ -1,20 +1,29 @@
-import re
+from collections.abc import Callable
+from functools import cache
+from typing import Type
 
 from inctrl.model import ISpec, InstrumentType
 
-IDN_REGEX = re.compile("^(?P<make>.+),(?P<model>.+),(?P<serial_number>.+),(?P<firmware>.+)$")
+
+@cache
+def _sds8_oscilloscope_class() -> Type:
+    """ Import the SDS8 driver class once, on first resolution of a matching instrument. """
+    from inctrl.drivers.oscilloscopes.siglent.sds8x import SDS8Oscilloscope
+    return SDS8Oscilloscope
 
 
 def _idn_to_spec_initial(address: str, idn: str) -> ISpec:
-    idn_match = IDN_REGEX.match(idn)
-    if idn_match:
+    # IDN response is a simple 4-field comma-separated record: make,model,serial,firmware.
+    idn_parts = idn.strip().split(",", 3)
+    if len(idn_parts) == 4 and all(idn_parts):
+        make, model, serial_number, firmware_version = idn_parts
         return ISpec(
             name = address,
             address = address,
-            make = idn_match.group("make"),
-            model = idn_match.group("model"),
-            serial_number = idn_match.group("serial_number"),
-            firmware_version = idn_match.group("firmware"),
+            make = make,
+            model = model,
+            serial_number = serial_number,
+            firmware_version = firmware_version,
             instrument_type = InstrumentType.UNKNOWN,
             instrument_class = None
         )
@@ -32,21 +41,22 @@ def _idn_to_spec_initial(address: str, idn: str) -> ISpec:
 
 
 class InstrumentsDB:
+    def __init__(self):
+        self.__vendor_handlers: dict[str, Callable[[ISpec], ISpec]] = {
+            "Siglent Technologies": self.__resolve_siglent,
+        }
+
     def __resolve_siglent(self, spec: ISpec) -> ISpec:
         if spec.model.startswith("SDS8"):
             # SDS8*** oscilloscope
             spec.instrument_type = InstrumentType.OSCILLOSCOPE
-            from inctrl.drivers.oscilloscopes.siglent.sds8x import SDS8Oscilloscope
-            spec.instrument_class = SDS8Oscilloscope
+            spec.instrument_class = _sds8_oscilloscope_class()
         return spec
 
     def get_spec(self, address: str, idn: str) -> ISpec:
         spec: ISpec = _idn_to_spec_initial(address, idn)
-        match spec.make:
-            case "Siglent Technologies":
-                return self.__resolve_siglent(spec)
-            case _:
-                return spec
+        handler = self.__vendor_handlers.get(spec.make)
+        return spec if handler is None else handler(spec)
 
 
 INSTRUMENT_DB_INSTANCE = InstrumentsDB()
@@ -1,7 +1,11 @@
+import re
 import time
-from struct import unpack
+from functools import lru_cache
+from struct import Struct
 
 import numpy as np
+from pyvisa import constants
+from pyvisa.errors import VisaIOError
 
 from inctrl import Duration, ScopeChanel, ChannelCoupling, ScopeTrigger
 from inctrl.drivers.command_dispatcher import CommandDispatcher
@@ -9,6 +13,53 @@ from inctrl.model import TriggerNamespace, ISpec, Waveform
 from inctrl.model.oscilloscope import Oscilloscope, ScopeProperties, ScopeEdgeTrigger, TriggerSlope
 from inctrl.model.time import TimeUnit
 
+# Time base values (in seconds) indexed by the "tdiv" field of the waveform preamble.
+_TDIV_ENUM = np.array(
+    [200e-12, 500e-12, 1e-9, 2e-9, 5e-9, 10e-9, 20e-9, 50e-9, 100e-9, 200e-9, 500e-9, 1e-6, 2e-6, 5e-6,
+     10e-6, 20e-6, 50e-6, 100e-6, 200e-6, 500e-6, 1e-3, 2e-3, 5e-3, 10e-3, 20e-3, 50e-3, 100e-3, 200e-3,
+     500e-3, 1, 2, 5, 10, 20, 50, 100, 200, 500, 1000],
+    dtype = np.float64
+)
+
+# Extracts the numeric value from an INR? response such as "INR 1".
+_INR_VALUE = re.compile(r"(-?\d+)")
+
+_U16 = Struct("<H")
+_U32 = Struct("<L")
+_F32 = Struct("<f")
+_F64 = Struct("<d")
+
+
+@lru_cache(maxsize = 256)
+def _scale_in_seconds(scale: str) -> Duration:
+    """
+    Parse a duration string and convert it to seconds. Cached because sweeps tend to pass
+    the same handful of scale literals over and over.
+    """
+    return Duration.value_of(scale).in_unit(TimeUnit.S)
+
+
+def _parse_coupling(coupling: str) -> ChannelCoupling:
+    match coupling:
+        case "AC":
+            return ChannelCoupling.AC
+        case "DC":
+            return ChannelCoupling.DC
+        case "GND":
+            return ChannelCoupling.DC
+        case _:
+            raise RuntimeError(f"Unknown coupling \"{coupling}\".")
+
+
+def _parse_impedance_oHm(impedance: str) -> float:
+    match impedance.lower():
+        case "onemeg":
+            return 1_000_000.0
+        case "fifty":
+            return 50.0
+        case _:
+            raise RuntimeError(f"Unknown impedance \"{impedance}\".")
+
 
 class SDS8OscilloscopeChannel(ScopeChanel):
     def __init__(self, scope, channel_num: int):
@@ -22,136 +73,255 @@ class SDS8OscilloscopeChannel(ScopeChanel):
     def internal_id(self) -> str:
         return f"C{self.__channel_num}"
 
-    def get_waveform(self, name: str | None = None) -> Waveform:
-        tdiv_enum = [200e-12, 500e-12, 1e-9, 2e-9, 5e-9, 10e-9, 20e-9, 50e-9, 100e-9, 200e-9, 500e-9, 1e-6, 2e-6, 5e-6,
-                     10e-6, 20e-6, 50e-6, 100e-6, 200e-6, 500e-6, 1e-3, 2e-3, 5e-3, 10e-3, 20e-3, 50e-3, 100e-3, 200e-3,
-                     500e-3, 1, 2, 5, 10, 20, 50, 100, 200, 500, 1000]
-        max_point = int(self.scope._cmd.query(":WAVEFORM:MAXPOINT?"))
-        self.scope._cmd.write(":WAVEFORM:BYTEORDER LSB")
-        self.scope._cmd.write(":WAVEFORM:START 0")
-        self.scope._cmd.write(f":WAVEFORM:POINT {max_point}")
-        self.scope._cmd.write(":WAVEFORM:INTERVAL 1")
-        self.scope._cmd.write(":WAVEFORM:WIDTH WORD")
-        self.scope._cmd.write(f":WAVEFORM:SOURCE C{self.__channel_num}")
-
-        header = self.scope._cmd.query_bytes(":WAVEFORM:PREAMBLE?")
-        num_points = unpack("<L", header[116:120])[0]
-        vertical_scale = unpack("<f", header[156:160])[0]  # "vdiv"
-        vertical_offset = unpack("<f", header[160:164])[0]  # "offset"
-        code_per_division = unpack("<f", header[164:168])[0]  # "code"
-        horizontal_interval = unpack("<f", header[176:180])[0]  # "interval"
-        trigger_offset_s = unpack("<d", header[180:188])[0]  # "delay"
-        time_base = tdiv_enum[unpack("<H", header[324:326])[0]]  # "tdiv"
-
-        data = self.scope._cmd.query_bytes(":WAVEFORM:DATA?")
-        ys = [v * vertical_scale / code_per_division - vertical_offset for v in list(np.frombuffer(data, "<h"))]
-        return Waveform(
+    def get_waveform(self, name: str | None = None, width: str = "WORD", out: np.ndarray | None = None) -> Waveform:
+        width = width.upper()
+        match width:
+            case "WORD":
+                sample_datatype = "h"
+            case "BYTE":
+                sample_datatype = "b"
+            case _:
+                raise RuntimeError(f"Unknown sample width \"{width}\". Valid values are \"WORD\" and \"BYTE\".")
+
+        # Within a single acquisition the data on the scope cannot change, so a repeated
+        # download of the same width would move identical megapoint records over SCPI for
+        # nothing. Caller-provided output buffers bypass the cache: the cached samples
+        # could alias a buffer the caller is free to overwrite.
+        cached = self._wf_cache
+        if out is None and cached is not None and cached[0] == self.scope._acq_gen and cached[1] == width:
+            waveform = cached[2]
+            if name is not None and name != waveform.name:
+                # Same samples under the requested name; shares ys, no re-download.
+                waveform = Waveform(
+                    dx_s = waveform.dt_s, trigger_index = waveform.trigger_index,
+                    ys = waveform.y(), name = name
+                )
+            return waveform
+
+        cmd = self.scope._cmd
+        max_point = int(cmd.query(":WAVEFORM:MAXPOINT?"))
+        cmd.write(
+            ":WAVEFORM:BYTEORDER LSB;"
+            ":WAVEFORM:START 0;"
+            f":WAVEFORM:POINT {max_point};"
+            ":WAVEFORM:INTERVAL 1;"
+            f":WAVEFORM:WIDTH {width};"
+            f":WAVEFORM:SOURCE C{self.__channel_num}"
+        )
+
+        header = cmd.query_bytes(":WAVEFORM:PREAMBLE?")
+        num_points = _U32.unpack_from(header, 116)[0]
+        vertical_scale = _F32.unpack_from(header, 156)[0]  # "vdiv"
+        vertical_offset = _F32.unpack_from(header, 160)[0]  # "offset"
+        code_per_division = _F32.unpack_from(header, 164)[0]  # "code"
+        horizontal_interval = _F32.unpack_from(header, 176)[0]  # "interval"
+        trigger_offset_s = _F64.unpack_from(header, 180)[0]  # "delay"
+        tdiv_index = _U16.unpack_from(header, 324)[0]  # "tdiv"
+        if tdiv_index >= len(_TDIV_ENUM):
+            raise RuntimeError(f"Time base index {tdiv_index} in the waveform preamble is out of range.")
+        time_base = float(_TDIV_ENUM[tdiv_index])
+
+        raw = cmd.query_binary_array(":WAVEFORM:DATA?", datatype = sample_datatype)
+        # float32 is lossless for the scope's ADC codes and halves the memory traffic of
+        # every downstream arithmetic op and Parquet write compared to float64.
+        caller_buffer = out is not None
+        if out is None or out.shape != raw.shape or out.dtype != np.float32:
+            out = np.empty(raw.shape, dtype = np.float32)
+        np.multiply(raw, vertical_scale / code_per_division, out = out)
+        np.subtract(out, vertical_offset, out = out)
+        ys = out
+        waveform = Waveform(
             dx_s = horizontal_interval,
             trigger_index = int(
                 (
                         time_base * self.scope.properties.number_of_time_divisions / 2 - trigger_offset_s
                 ) / horizontal_interval
             ),
-            ys = np.array(ys),
+            ys = ys,
             name = self.get_channel_name() if name is None else name
         )
+        if not caller_buffer:
+            self._wf_cache = (self.scope._acq_gen, width, waveform)
+        return waveform
 
     def set_coupling(self, coupling: ChannelCoupling, fail_on_error: bool = False) -> ChannelCoupling:
-        self.scope._cmd.write(f":CHANNEL{self.__channel_num}:COUPLING {coupling.value}", synchronize = True)
-        configured_coupling: ChannelCoupling = self.get_coupling()
+        configured_coupling = _parse_coupling(
+            self.scope._cmd.write_then_query(
+                f":CHANNEL{self.__channel_num}:COUPLING {coupling.value}",
+                f":CHANNEL{self.__channel_num}:COUPLING?"
+            )
+        )
         if configured_coupling != coupling and fail_on_error:
             raise RuntimeError(f"Failed to set coupling to \"{coupling.value}\"")
         else:
             return configured_coupling
 
     def get_coupling(self) -> ChannelCoupling:
-        coupling = self.scope._cmd.query(f":CHANNEL{self.__channel_num}:COUPLING?")
-        match coupling:
-            case "AC":
-                return ChannelCoupling.AC
-            case "DC":
-                return ChannelCoupling.DC
-            case "GND":
-                return ChannelCoupling.DC
-            case _:
-                raise RuntimeError(f"Unknown coupling \"{coupling}\".")
+        return _parse_coupling(self.scope._cmd.query(f":CHANNEL{self.__channel_num}:COUPLING?"))
 
     def set_scale_V(self, v: float) -> float:
-        self.scope._cmd.write(f":CHANNEL{self.__channel_num}:SCALE {v}", synchronize = True)
-        return self.get_scale_V()
+        return float(
+            self.scope._cmd.write_then_query(
+                f":CHANNEL{self.__channel_num}:SCALE {v}",
+                f":CHANNEL{self.__channel_num}:SCALE?"
+            )
+        )
 
     def get_scale_V(self) -> float:
         return float(self.scope._cmd.query(f":CHANNEL{self.__channel_num}:SCALE?"))
 
     def set_offset_V(self, offset_V: float) -> float:
-        self.scope._cmd.write(f":CHANNEL{self.__channel_num}:OFFSET {offset_V}", synchronize = True)
-        return self.get_offset_V()
+        return float(
+            self.scope._cmd.write_then_query(
+                f":CHANNEL{self.__channel_num}:OFFSET {offset_V}",
+                f":CHANNEL{self.__channel_num}:OFFSET?"
+            )
+        )
 
     def get_offset_V(self) -> float:
         return float(self.scope._cmd.query(f":CHANNEL{self.__channel_num}:OFFSET?"))
 
+    def _set_scale_and_offset_V(self, scale: float, offset: float) -> tuple[float, float]:
+        response = self.scope._cmd.query(
+            f":CHANNEL{self.__channel_num}:SCALE {scale};"
+            f":CHANNEL{self.__channel_num}:OFFSET {offset};"
+            "*OPC?;"
+            f":CHANNEL{self.__channel_num}:SCALE?;"
+            f":CHANNEL{self.__channel_num}:OFFSET?"
+        ).split(";")
+        return float(response[-2]), float(response[-1])
+
     def set_impedance_oHm(self, impedance_oHm: float, fail_on_error: bool = False) -> float:
         if impedance_oHm == 50.0:
-            self.scope._cmd.write(f":CHANNEL{self.__channel_num}:IMPEDANCE FIFTy", synchronize = True)
+            configured_impedance_oHm = _parse_impedance_oHm(
+                self.scope._cmd.write_then_query(
+                    f":CHANNEL{self.__channel_num}:IMPEDANCE FIFTy",
+                    f":CHANNEL{self.__channel_num}:IMPEDANCE?"
+                )
+            )
         elif impedance_oHm == 1_000_000.0:
-            self.scope._cmd.write(f":CHANNEL{self.__channel_num}:IMPEDANCE ONEMeg", synchronize = True)
+            configured_impedance_oHm = _parse_impedance_oHm(
+                self.scope._cmd.write_then_query(
+                    f":CHANNEL{self.__channel_num}:IMPEDANCE ONEMeg",
+                    f":CHANNEL{self.__channel_num}:IMPEDANCE?"
+                )
+            )
         elif fail_on_error:
             raise RuntimeError(f"Failed to set impedance to \"{impedance_oHm}\" OHm")
+        else:
+            configured_impedance_oHm = self.get_impedance_oHm()
 
-        configured_impedance_oHm = self.get_impedance_oHm()
         if configured_impedance_oHm != impedance_oHm and fail_on_error:
             raise RuntimeError(f"Failed to set impedance to \"{impedance_oHm}\" OHm")
 
         return configured_impedance_oHm
 
     def get_impedance_oHm(self) -> float:
-        impedance = self.scope._cmd.query(f":CHANNEL{self.__channel_num}:IMPEDANCE?").lower()
-        match impedance:
-            case "onemeg":
-                return 1_000_000.0
-            case "fifty":
-                return 50.0
-            case _:
-                raise RuntimeError(f"Unknown impedance \"{impedance}\".")
+        return _parse_impedance_oHm(self.scope._cmd.query(f":CHANNEL{self.__channel_num}:IMPEDANCE?"))
 
 
 class SDS8OscilloscopeTriggerNamespace(TriggerNamespace):
+    # Poll interval for the fallback path. Polling without a delay floods the scope
+    # SCPI parser and pins the host CPU at 100%.
+    _POLL_INTERVAL_S = 0.005
+
     def __init__(self, scope):
         self.scope: SDS8Oscilloscope = scope
+        try:
+            # Raise a service request when acquisition completes so that wait_for_waveform()
+            # can block on the event instead of polling trigger status.
+            self.scope._cmd.write("*ESE 1;*SRE 32")
+            self.scope._cmd.visa_resource.enable_event(
+                constants.EventType.service_request, constants.EventMechanism.queue
+            )
+            self.__srq_supported = True
+        except (VisaIOError, AttributeError, NotImplementedError):
+            self.__srq_supported = False
 
     def configure(self, trigger: ScopeTrigger) -> None:
         if isinstance(trigger, ScopeEdgeTrigger):
-            self.scope._cmd.write(":TRIGGER:TYPE EDGE")
-            self.scope._cmd.write(f":TRIGGER:EDGE:SOURCE {trigger.trigger_source.internal_id()}")
-            self.scope._cmd.write(f":TRIGGER:EDGE:LEVEL {trigger.level_V}")
-
             match trigger.slope:
                 case TriggerSlope.RISING:
-                    self.scope._cmd.write(f":TRIGGER:EDGE:SLOPE RISING")
+                    slope = "RISING"
                 case TriggerSlope.FALLING:
-                    self.scope._cmd.write(f":TRIGGER:EDGE:SLOPE FALLING")
+                    slope = "FALLING"
                 case _:
                     raise RuntimeError(f"Unknown trigger slope \"{trigger.slope}\".")
 
             target_scale_s = trigger.delay.in_unit(TimeUnit.S)
-            self.scope._cmd.write(f":TIMEBASE:DELAY {target_scale_s}", synchronize = True)
+            self.scope._cmd.write_many(
+                [
+                    ":TRIGGER:TYPE EDGE",
+                    f":TRIGGER:EDGE:SOURCE {trigger.trigger_source.internal_id()}",
+                    f":TRIGGER:EDGE:LEVEL {trigger.level_V}",
+                    f":TRIGGER:EDGE:SLOPE {slope}",
+                    f":TIMEBASE:DELAY {target_scale_s}",
+                ],
+                synchronize = True
+            )
         else:
             raise RuntimeError(f"Unknown scope trigger \"{trigger}\".")
 
+    # Note: arm_* methods do not synchronize on *OPC?. SCPI processes commands in order,
+    # so the first status query issued by wait_for_waveform() acts as the synchronization
+    # point and we save one VISA round-trip per arm. The trailing *OPC command (unlike the
+    # *OPC? query, which only answers through the output queue) sets ESR bit 0 once the
+    # armed acquisition completes; *ESE 1;*SRE 32 from __init__ turns that into the
+    # service request wait_for_waveform() blocks on.
     def arm_single(self) -> None:
-        self.scope._cmd.write(":TRIGGER:MODE SINGLE")
-        self.scope._cmd.write(":TRIGGER:RUN", synchronize = True)
+        self.__arm("SINGLE")
 
     def arm_auto(self) -> None:
-        self.scope._cmd.write(":TRIGGER:MODE AUTO")
-        self.scope._cmd.write(":TRIGGER:RUN", synchronize = True)
+        self.__arm("AUTO")
 
     def arm_normal(self) -> None:
-        self.scope._cmd.write(":TRIGGER:MODE NORMAL")
-        self.scope._cmd.write(":TRIGGER:RUN", synchronize = True)
+        self.__arm("NORMAL")
+
+    def __arm(self, mode: str) -> None:
+        self.scope._acq_gen += 1
+        if self.__srq_supported:
+            try:
+                # Drop service requests left over from a previous acquisition so that
+                # wait_for_waveform() does not wake up on a stale event.
+                self.scope._cmd.visa_resource.discard_events(
+                    constants.EventType.service_request, constants.EventMechanism.queue
+                )
+            except (VisaIOError, AttributeError, NotImplementedError):
+                pass
+        self.scope._cmd.write(f":TRIGGER:MODE {mode};:TRIGGER:RUN;*OPC")
 
     def wait_for_waveform(self, timeout: str | Duration | None = None, error_on_timeout: bool = False) -> bool:
+        triggered = self.__wait_for_trigger(timeout, error_on_timeout)
+        if triggered:
+            # A completed wait means a fresh capture, so the per-acquisition waveform
+            # caches must be invalidated. This matters in AUTO/NORMAL mode where the
+            # scope re-triggers without a new arm_*() call.
+            self.scope._acq_gen += 1
+        return triggered
+
+    def __wait_for_trigger(self, timeout: str | Duration | None, error_on_timeout: bool) -> bool:
         timeout_s = -1 if timeout is None else Duration.value_of(timeout).to_float(TimeUnit.S)
+
+        if self.__srq_supported:
+            try:
+                timeout_ms = constants.VI_TMO_INFINITE if timeout_s < 0 else int(timeout_s * 1000)
+                self.scope._cmd.visa_resource.wait_on_event(constants.EventType.service_request, timeout_ms)
+                return True
+            except VisaIOError as error:
+                if error.error_code == constants.StatusCode.error_timeout:
+                    # The event may have been lost (e.g. raised before the transport started
+                    # queueing), so confirm against the trigger status with one query before
+                    # reporting failure.
+                    if self.__acquisition_complete():
+                        return True
+                    elif error_on_timeout:
+                        raise RuntimeError(f"Timeout {timeout} exceeded.")
+                    else:
+                        return False
+                else:
+                    # Transport turned out not to deliver service requests. Fall back to polling.
+                    self.__srq_supported = False
+
         mode = self.scope._cmd.query(f":TRIGGER:MODE?").lower()
         start_at = time.time()
         if mode == "single":
@@ -165,9 +335,11 @@ class SDS8OscilloscopeTriggerNamespace(TriggerNamespace):
                             raise RuntimeError(f"Timeout {timeout} exceeded.")
                         else:
                             return False
+                time.sleep(self._POLL_INTERVAL_S)
         else:
             while True:
-                inr = int(self.scope._cmd.query("INR?").lower().replace("inr", "").strip())
+                inr_match = _INR_VALUE.search(self.scope._cmd.query("INR?"))
+                inr = 0 if inr_match is None else int(inr_match.group(1))
                 if inr & 0x01 == 1:
                     return True
                 elif timeout_s >= 0:
@@ -176,6 +348,14 @@ class SDS8OscilloscopeTriggerNamespace(TriggerNamespace):
                             raise RuntimeError(f"Timeout {timeout} exceeded.")
                         else:
                             return False
+                time.sleep(self._POLL_INTERVAL_S)
+
+    def __acquisition_complete(self) -> bool:
+        """ One-shot status check mirroring the poll loops of wait_for_waveform(). """
+        if self.scope._cmd.query(":TRIGGER:MODE?").lower() == "single":
+            return self.scope._cmd.query(":TRIGGER:STATUS?").lower() == "stop"
+        inr_match = _INR_VALUE.search(self.scope._cmd.query("INR?"))
+        return inr_match is not None and int(inr_match.group(1)) & 0x01 == 1
 
     def is_armed(self) -> bool:
         return self.scope._cmd.query(":TRIGGER:STATUS?").lower() != "stop"
@@ -190,7 +370,7 @@ class SDS8Oscilloscope(Oscilloscope):
         self._cmd = cmd
 
         self.__properties = ScopeProperties(
-            valid_impedance_values = [1000000.0],
+            valid_impedance_values = (1000000.0,),
             number_of_time_divisions = 10,
             number_of_vertical_divisions = 8,
             number_of_channels = int(spec.model[5]),
@@ -199,8 +379,7 @@ class SDS8Oscilloscope(Oscilloscope):
         self.__trigger_namespace = SDS8OscilloscopeTriggerNamespace(self)
 
     def channel(self, channel: int | str) -> SDS8OscilloscopeChannel:
-        self._cmd.write(f":CHANNEL{channel}:SWITCH ON")
-        self._cmd.write(f":CHANNEL{channel}:VISIBLE ON")
+        self._cmd.write(f":CHANNEL{channel}:SWITCH ON;:CHANNEL{channel}:VISIBLE ON")
         return SDS8OscilloscopeChannel(self, channel)
 
     @property
@@ -208,7 +387,7 @@ class SDS8Oscilloscope(Oscilloscope):
         return self.__trigger_namespace
 
     def set_time_scale(self, scale: str | Duration) -> Duration:
-        target_scale_s = Duration.value_of(scale).in_unit(TimeUnit.S)
+        target_scale_s = _scale_in_seconds(scale) if isinstance(scale, str) else scale.in_unit(TimeUnit.S)
         self._cmd.write(f":TIMEBASE:SCALE {target_scale_s}", synchronize = True)
         return self.get_time_scale()
 
@@ -223,6 +402,10 @@ class SDS8Oscilloscope(Oscilloscope):
     def reset(self) -> None:
         self._cmd.write("*RST", synchronize = True)
 
-        for channel in range(1, self.properties.number_of_channels + 1):
-            self._cmd.write(f":CHANNEL{channel}:SWITCH OFF")
-            self._cmd.write(f":CHANNEL{channel}:VISIBLE OFF", synchronize = True)
+        self._cmd.write(
+            ";".join(
+                f":CHANNEL{channel}:SWITCH OFF;:CHANNEL{channel}:VISIBLE OFF"
+                for channel in range(1, self.properties.number_of_channels + 1)
+            ),
+            synchronize = True
+        )
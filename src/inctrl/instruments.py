@@ -1,3 +1,5 @@
+from concurrent.futures import ThreadPoolExecutor
+from functools import cache
 from typing import Any
 
 from pyvisa import ResourceManager, Resource
@@ -9,23 +11,33 @@ from inctrl.model import ISpec, InstrumentType
 from inctrl.model.oscilloscope import Oscilloscope
 
 
+@cache
+def _rm() -> ResourceManager:
+    """ Shared ResourceManager. VISA library initialization is expensive, so do it only once. """
+    return ResourceManager()
+
+
 def list_instruments(print_to_stdout: bool = True) -> list[ISpec]:
     """
     Obtain and optionally print (default is to print) list of available/connected
     instruments. Returns list of ISpec objects.
     """
-    rm = ResourceManager()
+    rm = _rm()
     addresses = rm.list_resources()
-    instrument_specs: list[ISpec] = []
 
-    for address in addresses:
+    def probe(address: str) -> ISpec:
         resource: Resource = rm.open_resource(address)
         try:
             idn = resource.query("*IDN?")
-            instrument_specs.append(INSTRUMENT_DB_INSTANCE.get_spec(address, idn))
+            return INSTRUMENT_DB_INSTANCE.get_spec(address, idn)
         finally:
             resource.close()
 
+    # Probing is I/O bound waiting on each instrument to answer *IDN?, so query
+    # all of them concurrently instead of one after another.
+    with ThreadPoolExecutor(max_workers = 8) as executor:
+        instrument_specs: list[ISpec] = list(executor.map(probe, addresses))
+
     if print_to_stdout:
         table = [
             [s.name, s.address, s.make, s.model, s.instrument_type.value]
@@ -37,8 +49,7 @@ def list_instruments(print_to_stdout: bool = True) -> list[ISpec]:
 
 
 def _get_spec(address: str) -> tuple[CommandDispatcher, ISpec]:
-    rm = ResourceManager()
-    resource = rm.open_resource(address)
+    resource = _rm().open_resource(address)
     if resource is None:
         raise RuntimeError("Resource not found")
     else:
@@ -1,5 +1,40 @@
-from .ispec import ISpec, InstrumentType
-from .oscilloscope import Oscilloscope, ScopeChanel, TriggerSlope, TriggerSource, TriggerNamespace, \
-    ScopeTrigger, ChannelCoupling
-from .time import Duration, TimeUnit
-from .waveform import Waveform
+from importlib import import_module
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from .ispec import ISpec, InstrumentType
+    from .oscilloscope import Oscilloscope, ScopeChanel, TriggerSlope, TriggerSource, TriggerNamespace, \
+        ScopeTrigger, ChannelCoupling
+    from .time import Duration, DurationArray, TimeUnit
+    from .waveform import Waveform
+
+# Same lazy-resolution scheme as the package root: submodules are imported on first
+# attribute access, so pulling Duration does not drag in the pyarrow-backed waveform code.
+_LAZY_ATTRS = {
+    "ISpec": "inctrl.model.ispec",
+    "InstrumentType": "inctrl.model.ispec",
+    "Oscilloscope": "inctrl.model.oscilloscope",
+    "ScopeChanel": "inctrl.model.oscilloscope",
+    "TriggerSlope": "inctrl.model.oscilloscope",
+    "TriggerSource": "inctrl.model.oscilloscope",
+    "TriggerNamespace": "inctrl.model.oscilloscope",
+    "ScopeTrigger": "inctrl.model.oscilloscope",
+    "ChannelCoupling": "inctrl.model.oscilloscope",
+    "Duration": "inctrl.model.time",
+    "DurationArray": "inctrl.model.time",
+    "TimeUnit": "inctrl.model.time",
+    "Waveform": "inctrl.model.waveform",
+}
+
+
+def __getattr__(name: str):
+    module_name = _LAZY_ATTRS.get(name)
+    if module_name is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(import_module(module_name), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(_LAZY_ATTRS))
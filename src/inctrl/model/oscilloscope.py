@@ -1,16 +1,24 @@
+import asyncio
 from abc import ABC, abstractmethod
-from dataclasses import dataclass
+from bisect import bisect_left
+from collections.abc import Sequence
 from enum import Enum, IntEnum
-from typing import Self, Type
+from typing import NamedTuple, Self, Type
 
-from inctrl.model.time import Duration
+from numpy import ndarray
+
+from inctrl.model.time import Duration, TimeUnit
 from inctrl.model.waveform import Waveform
 
+_ZERO_DURATION = Duration.intern(0, TimeUnit.NS)
+
 
 class TriggerSource(ABC):
+    __slots__ = ()
+
     @abstractmethod
     def internal_id(self) -> str:
-        pass
+        """ Identifier of this trigger source as understood by the instrument, e.g. "C1". """
 
 
 class ChannelCoupling(str, Enum):
@@ -27,10 +35,22 @@ class ChannelImpedance(IntEnum):
 class ScopeChanel(TriggerSource):
     def __init__(self, channel_name: str | None, channel_num: int):
         self.__channel_name = f"Channel #{channel_num}" if channel_name is None else channel_name
+        self.__number_of_vertical_divisions: int | None = None
+        # Waveform downloaded within the current acquisition, as (generation, width,
+        # waveform). Drivers use it to make repeated get_waveform() calls on the same
+        # acquisition idempotent instead of re-downloading identical data.
+        self._wf_cache: tuple[int, str, Waveform] | None = None
+
+    @property
+    def _nvdiv(self) -> int:
+        """ Number of vertical divisions, cached since scope properties never change. """
+        if self.__number_of_vertical_divisions is None:
+            self.__number_of_vertical_divisions = self._scope().properties.number_of_vertical_divisions
+        return self.__number_of_vertical_divisions
 
     @abstractmethod
     def _scope(self) -> "Oscilloscope":
-        pass
+        """ Return the oscilloscope this channel belongs to. """
 
     def get_channel_name(self) -> str:
         """ Returns name of the channel. """
@@ -40,11 +60,14 @@ class ScopeChanel(TriggerSource):
         self.__channel_name = channel_name
 
     @abstractmethod
-    @abstractmethod
-    def get_waveform(self, name: str | None = None) -> Waveform:
-        """ 
-        Download waveform from the oscilloscope. Waveform will have a name derived from channel number 
-        or if argument `name` is provided, it will be used as a Waveform name. 
+    def get_waveform(self, name: str | None = None, width: str = "WORD", out: "ndarray | None" = None) -> Waveform:
+        """
+        Download waveform from the oscilloscope. Waveform will have a name derived from channel number
+        or if argument `name` is provided, it will be used as a Waveform name. Argument `width` selects
+        sample width used for the transfer; "WORD" (default) downloads 16-bit samples while "BYTE"
+        downloads 8-bit samples, which halves the amount of data moved and is lossless on 8-bit ADCs.
+        If `out` is provided and has matching shape and dtype, samples are scaled into it in place,
+        which avoids allocating a fresh array on every acquisition in continuous capture loops.
         """
 
     ################################ Coupling ################################
@@ -81,11 +104,11 @@ class ScopeChanel(TriggerSource):
 
     def set_impedance_min(self) -> float:
         """ Set impedance to the minimum value and return actually configured value in oHm """
-        return self.set_impedance_oHm(min(self._scope().properties.valid_impedance_values))
+        return self.set_impedance_oHm(self._scope().properties.valid_impedance_values[0])
 
     def set_impedance_max(self) -> float:
         """ Set impedance to the maximum value and return actually configured value in oHm """
-        return self.set_impedance_oHm(max(self._scope().properties.valid_impedance_values))
+        return self.set_impedance_oHm(self._scope().properties.valid_impedance_values[-1])
 
     ################################ Vertical Scaling ################################
     def set_range_V(self, v_min: float, v_max: float) -> tuple[float, float]:
@@ -93,15 +116,25 @@ class ScopeChanel(TriggerSource):
         Set voltage range to be at minimum from v_min to v_max and return actually configured range.
         Raises RuntimeError if v_min >= v_max.
         """
-        scale = (v_max - v_min) / self._scope().properties.number_of_vertical_divisions
-        self.set_scale_V(scale)
-        self.set_offset_V((v_max - v_min) / 2 - v_max)
-        return self.get_range_V()
+        number_of_divisions = self._nvdiv
+        scale = (v_max - v_min) / number_of_divisions
+        offset = (v_max - v_min) / 2 - v_max
+        set_scale, set_offset = self._set_scale_and_offset_V(scale, offset)
+        dv = set_scale * number_of_divisions / 2
+        return -set_offset - dv, -set_offset + dv
+
+    def _set_scale_and_offset_V(self, scale: float, offset: float) -> tuple[float, float]:
+        """
+        Set vertical scale and offset together and return actually configured (scale, offset).
+        Default implementation issues the two setters one after another; drivers that can batch
+        SCPI commands should override this with a single compound write/read.
+        """
+        return self.set_scale_V(scale), self.set_offset_V(offset)
 
     def get_range_V(self) -> tuple[float, float]:
         """ Return voltage range currently configured on the channel. """
         offset_V = self.get_offset_V()
-        dv = self.get_scale_V() * self._scope().properties.number_of_vertical_divisions / 2
+        dv = self.get_scale_V() * self._nvdiv / 2
         return -offset_V - dv, -offset_V + dv
 
     @abstractmethod
@@ -127,26 +160,30 @@ class TriggerSlope(str, Enum):
 
 
 class ScopeTrigger(ABC):
-    def __init__(self, trigger_source: TriggerSource, delay: Duration):
+    __slots__ = ("trigger_source", "delay")
+
+    def __init__(self, trigger_source: TriggerSource, delay: str | Duration):
         self.trigger_source = trigger_source
-        self.delay = delay
+        self.delay = delay if isinstance(delay, Duration) else Duration.value_of(delay)
 
     @classmethod
     def EDGE(cls,
              trigger_source: TriggerSource,
              level_V: float,
              slope: TriggerSlope = TriggerSlope.RISING,
-             delay: str | Duration = Duration.value_of("0 s")) -> Self:
+             delay: str | Duration = _ZERO_DURATION) -> Self:
         return ScopeEdgeTrigger(trigger_source, level_V, slope, delay)
 
 
 class ScopeEdgeTrigger(ScopeTrigger):
+    __slots__ = ("level_V", "slope")
+
     def __init__(self,
                  trigger_source: TriggerSource,
                  level_V: float,
                  slope: TriggerSlope = TriggerSlope.RISING,
-                 delay: str = "0 s"):
-        super().__init__(trigger_source, Duration.value_of(delay))
+                 delay: str | Duration = _ZERO_DURATION):
+        super().__init__(trigger_source, delay)
         self.level_V = level_V
         self.slope = slope
 
@@ -187,6 +224,17 @@ class TriggerNamespace(ABC):
         value is not None in which case RuntimeError will be raised.
         """
 
+    async def wait_for_waveform_async(self, timeout: str | Duration | None = None,
+                                      error_on_timeout: bool = False) -> bool:
+        """
+        Asynchronous variant of `wait_for_waveform(...)` with the same semantics. Default
+        implementation runs the blocking wait in a worker thread so that the event loop is not
+        stalled and several scopes can be awaited concurrently, e.g. via
+        `asyncio.gather(*(s.trigger.wait_for_waveform_async() for s in scopes))`.
+        Drivers with a native asynchronous transport may override this.
+        """
+        return await asyncio.to_thread(self.wait_for_waveform, timeout, error_on_timeout)
+
     @abstractmethod
     def is_armed(self) -> bool:
         """
@@ -201,15 +249,36 @@ class TriggerNamespace(ABC):
         """
 
 
-@dataclass(frozen = True)
-class ScopeProperties:
-    valid_impedance_values: list[float]
+class ScopeProperties(NamedTuple):
+    # A NamedTuple rather than a dataclass: properties are read on every set_range_V /
+    # set_time_window call and C-level tuple attribute access keeps that cost negligible.
+    # Invariant: sorted in ascending order, so that min/max are simply the first and
+    # the last element.
+    valid_impedance_values: tuple[float, ...]
     number_of_time_divisions: int
     number_of_vertical_divisions: int
     number_of_channels: int
 
+    # Sorted tuple of time scales the scope supports, if known. Drivers that provide it let
+    # set_time_window() pick the right scale in a single round-trip.
+    valid_time_scales: tuple[Duration, ...] | None = None
+
 
 class Oscilloscope(ABC):
+    __number_of_time_divisions: int | None = None
+
+    # Acquisition generation counter. Drivers increment it whenever the trigger is re-armed;
+    # channel waveform caches compare against it to decide whether a cached waveform still
+    # belongs to the current acquisition.
+    _acq_gen: int = 0
+
+    @property
+    def _ntdiv(self) -> int:
+        """ Number of horizontal divisions, cached since scope properties never change. """
+        if self.__number_of_time_divisions is None:
+            self.__number_of_time_divisions = self.properties.number_of_time_divisions
+        return self.__number_of_time_divisions
+
     def as_class[T: Oscilloscope](self, clazz: Type[T]) -> T:
         """ Cast instance of this class to `clazz` or raise RuntimeError it is not possible. """
         if isinstance(self, clazz):
@@ -226,6 +295,15 @@ class Oscilloscope(ABC):
         :param channel: channel number or name
         """
 
+    def get_waveforms(self, channels: Sequence[int | str]) -> dict[int | str, Waveform]:
+        """
+        Download waveforms from several channels over a single scope connection and return
+        them keyed by the channel argument. Default implementation loops over
+        `channel(...).get_waveform()`; drivers can override it to batch the per-channel
+        SCPI transactions (e.g. skip re-sending the common waveform setup between channels).
+        """
+        return {channel: self.channel(channel).get_waveform() for channel in channels}
+
     @property
     @abstractmethod
     def trigger(self) -> TriggerNamespace:
@@ -237,19 +315,40 @@ class Oscilloscope(ABC):
         Return actually set time window, which will always be equal or larger than requested value.
         """
         requested_time_window: Duration = Duration.value_of(time_window)
-        requested_scale_ref: Duration = requested_time_window / self.properties.number_of_time_divisions
-        requested_scale = requested_scale_ref
-        for i in range(50):  # try max 50 times
-            set_scale = self.set_time_scale(requested_scale)
-            if set_scale >= requested_scale:
-                return self.get_time_window()
+        requested_scale: Duration = requested_time_window / self._ntdiv
+
+        valid_time_scales = self.properties.valid_time_scales
+        if valid_time_scales is not None:
+            index = bisect_left(valid_time_scales, requested_scale)
+            self.set_time_scale(valid_time_scales[min(index, len(valid_time_scales) - 1)])
+            return self.get_time_window()
+
+        if self.set_time_scale(requested_scale) >= requested_scale:
+            return self.get_time_window()
+
+        # The scope clipped the requested scale down. Grow the request geometrically until it
+        # sticks, then bisect back toward the smallest multiplier that still satisfies it.
+        lo, hi = 1.0, 2.0
+        for _ in range(8):
+            if self.set_time_scale(requested_scale * hi) >= requested_scale:
+                break
+            lo, hi = hi, hi * 2
+        else:
+            return self.get_time_window()
+
+        for _ in range(4):
+            mid = (lo + hi) / 2
+            if self.set_time_scale(requested_scale * mid) >= requested_scale:
+                hi = mid
             else:
-                requested_scale = requested_scale_ref * (1 + 0.1 * i)
+                lo = mid
+
+        self.set_time_scale(requested_scale * hi)
         return self.get_time_window()
 
     def get_time_window(self) -> Duration:
         """ Return current time window configured on the oscilloscope. """
-        return (self.get_time_scale() * self.properties.number_of_time_divisions).optimize()
+        return (self.get_time_scale() * self._ntdiv).optimize()
 
     @abstractmethod
     def set_time_scale(self, scale: str | Duration) -> Duration:
@@ -266,4 +365,4 @@ class Oscilloscope(ABC):
 
     @abstractmethod
     def reset(self) -> None:
-        pass
+        """ Reset the oscilloscope to its default state. """
@@ -1,7 +1,11 @@
-import re
+from bisect import bisect_right
 from enum import IntEnum
+from functools import lru_cache
 from typing import Self, Any
 
+import numpy as np
+from numpy import ndarray
+
 
 class TimeUnit(IntEnum):
     NS = 1
@@ -11,137 +15,279 @@ class TimeUnit(IntEnum):
     KS = 1_000_000_000_000
 
     @staticmethod
+    @lru_cache(maxsize = 32)
     def value_of(s: Any) -> "TimeUnit":
         if isinstance(s, TimeUnit):
             return s
-        else:
-            match f"{s}".lower():
-                case "ns":
-                    return TimeUnit.NS
-                case "us":
-                    return TimeUnit.US
-                case "ms":
-                    return TimeUnit.MS
-                case "s":
-                    return TimeUnit.S
-                case "ks":
-                    return TimeUnit.KS
-                case _:
-                    raise RuntimeError(f"Unknown time unit: {s}")
+        unit = _UNIT_FROM_STR.get(f"{s}".lower())
+        if unit is None:
+            raise RuntimeError(f"Unknown time unit: {s}")
+        return unit
 
     def to_str(self) -> str:
-        match self:
-            case TimeUnit.NS:
-                return "ns"
-            case TimeUnit.US:
-                return "us"
-            case TimeUnit.MS:
-                return "ms"
-            case TimeUnit.S:
-                return "s"
-            case TimeUnit.KS:
-                return "ks"
-            case _:
-                raise RuntimeError(f"Unknown time unit: {self}")
+        return _UNIT_TO_STR[self]
+
+
+_UNIT_FROM_STR = {"ns": TimeUnit.NS, "us": TimeUnit.US, "ms": TimeUnit.MS, "s": TimeUnit.S, "ks": TimeUnit.KS}
+_UNIT_TO_STR = {unit: s for s, unit in _UNIT_FROM_STR.items()}
+
+# Maps a unit suffix directly to its nanosecond multiplier (== TimeUnit value). Units are
+# valid either fully lowercase or fully uppercase; mixed case is not supported.
+_NS_PER_UNIT: dict[str, int] = {}
+for _unit_str, _unit in _UNIT_FROM_STR.items():
+    _NS_PER_UNIT[_unit_str] = _unit.value
+    _NS_PER_UNIT[_unit_str.upper()] = _unit.value
+
+
+_OPTIMIZE_UNITS = (TimeUnit.NS, TimeUnit.US, TimeUnit.MS, TimeUnit.S, TimeUnit.KS)
+# Picosecond magnitudes at which the optimal display unit steps up to the next entry of
+# _OPTIMIZE_UNITS. bisect_right over this table yields the unit index in one C call.
+_OPTIMIZE_THRESHOLDS_PS = (10 ** 6, 10 ** 9, 10 ** 12, 10 ** 15)
+
+# Shared instances of commonly used durations (zero delays, defaults and the like),
+# keyed by (picoseconds, display unit). Populated through Duration.intern().
+_INTERN: dict[tuple[int, TimeUnit], "Duration"] = {}
 
 
 class Duration:
-    __matcher = re.compile(
-        r"""^\s*(?P<value>-?\d+(?:\.\d+)?(?:[eE][+-]?\d+)?)\s*(?P<unit>ks|s|ms|us|ns|KS|S|MS|US|NS)\s*$"""
-    )
+    """
+    Time interval stored canonically as an integer number of picoseconds. The `time_unit`
+    attribute is only a display hint; all arithmetic and comparisons are plain integer
+    operations, which also makes them immune to float unit-conversion round-off.
+    """
+
+    __slots__ = ("_ps", "time_unit")
 
     def __init__(self, time_interval: float, time_unit: TimeUnit):
-        self.__time_interval = time_interval
+        self._ps = round(time_interval * time_unit.value * 1000)
         self.time_unit = time_unit
 
+    @classmethod
+    def _from_ps(cls, ps: int, time_unit: TimeUnit) -> "Duration":
+        duration = cls.__new__(cls)
+        duration._ps = ps
+        duration.time_unit = time_unit
+        return duration
+
+    @classmethod
+    def from_seconds(cls, seconds: float) -> "Duration":
+        """
+        Construct a duration directly from a number of seconds. Equivalent to
+        `Duration.value_of(f"{seconds} s")` without the string round-trip.
+        """
+        return cls(seconds, TimeUnit.S)
+
+    @classmethod
+    def intern(cls, time_interval: float, time_unit: TimeUnit) -> "Duration":
+        """
+        Return a shared instance for the given value, constructing it on first use. Durations
+        are immutable, so frequently used constants can safely be shared instead of allocated
+        on every call.
+        """
+        key = (round(time_interval * time_unit.value * 1000), time_unit)
+        duration = _INTERN.get(key)
+        if duration is None:
+            duration = cls._from_ps(key[0], time_unit)
+            _INTERN[key] = duration
+        return duration
+
     def __str__(self):
-        return f"{self.__time_interval} {self.time_unit.to_str()}"
+        return f"{self.to_float(self.time_unit)} {self.time_unit.to_str()}"
 
     def __repr__(self):
-        return f"Duration({self.__time_interval}, {self.time_unit.to_str()})"
+        return f"Duration({self.to_float(self.time_unit)}, {self.time_unit.to_str()})"
 
+    # Arithmetic results keep the left operand's display unit. Re-optimizing the unit on
+    # every intermediate would be wasted work in chained expressions; callers that show a
+    # result to the user optimize it once at the display boundary (as get_time_window does).
     def __add__(self, other):
-        if isinstance(other, Duration):
-            return Duration(
-                time_interval = self.__time_interval + other.to_float(self.time_unit),
-                time_unit = self.time_unit
-            ).optimize()
+        if type(other) is Duration:
+            return Duration._from_ps(self._ps + other._ps, self.time_unit)
 
     def __sub__(self, other):
-        if isinstance(other, Duration):
-            return Duration(
-                time_interval = self.__time_interval - other.to_float(self.time_unit),
-                time_unit = self.time_unit
-            ).optimize()
+        if type(other) is Duration:
+            return Duration._from_ps(self._ps - other._ps, self.time_unit)
 
+    # Scaling by 1 comes up naturally in retry loops (e.g. the first set_time_window
+    # iteration); Duration is immutable, so returning self is safe and skips an allocation.
     def __mul__(self, scale):
-        return Duration(self.__time_interval * scale, self.time_unit)
+        if scale == 1:
+            return self
+        return Duration._from_ps(round(self._ps * scale), self.time_unit)
 
-    def __rmul__(self, scale):
-        return Duration(self.__time_interval * scale, self.time_unit)
+    # Scalar multiplication commutes, so the reflected form shares the implementation.
+    __rmul__ = __mul__
 
     def __truediv__(self, scale):
-        return Duration(self.__time_interval / scale, self.time_unit)
+        if scale == 1:
+            return self
+        return Duration._from_ps(round(self._ps / scale), self.time_unit)
 
     def __gt__(self, other):
-        if isinstance(other, Duration):
-            return self.__time_interval > other.to_float(self.time_unit)
-        else:
-            raise RuntimeError("Duration can only be compared to another duration")
+        if type(other) is Duration:
+            return self._ps > other._ps
+        raise RuntimeError("Duration can only be compared to another duration")
 
     def __ge__(self, other):
-        if isinstance(other, Duration):
-            return self.__time_interval > other.to_float(self.time_unit) or self == other
-        else:
-            raise RuntimeError("Duration can only be compared to another duration")
+        if type(other) is Duration:
+            return self._ps >= other._ps
+        raise RuntimeError("Duration can only be compared to another duration")
 
     def __lt__(self, other):
-        if isinstance(other, Duration):
-            return self.__time_interval < other.to_float(self.time_unit)
-        else:
-            raise RuntimeError("Duration can only be compared to another duration")
+        if type(other) is Duration:
+            return self._ps < other._ps
+        raise RuntimeError("Duration can only be compared to another duration")
 
     def __le__(self, other):
-        if isinstance(other, Duration):
-            return self.__time_interval < other.to_float(self.time_unit) or self == other
-        else:
-            raise RuntimeError("Duration can only be compared to another duration")
+        if type(other) is Duration:
+            return self._ps <= other._ps
+        raise RuntimeError("Duration can only be compared to another duration")
 
     def __eq__(self, other):
-        if isinstance(other, Duration):
-            return abs(self - other) < ONE_PICOSECOND
-        else:
-            raise RuntimeError("Duration can only be compared to another duration")
+        if type(other) is Duration:
+            return self._ps == other._ps
+        raise RuntimeError("Duration can only be compared to another duration")
+
+    def __hash__(self):
+        # Hash only the canonical picosecond count so that equal durations expressed in
+        # different units hash the same, making Duration usable as a dict/set key.
+        return hash(self._ps)
 
     def __abs__(self):
-        return Duration(abs(self.__time_interval), self.time_unit)
+        return Duration._from_ps(abs(self._ps), self.time_unit)
 
     def in_unit(self, time_unit: str | TimeUnit) -> Self:
-        target_time_unit = TimeUnit.value_of(time_unit)
-        return Duration(
-            self.__time_interval * self.time_unit.value / target_time_unit.value,
-            target_time_unit
-        )
+        return Duration._from_ps(self._ps, TimeUnit.value_of(time_unit))
 
     @staticmethod
     def value_of(s: Any) -> "Duration":
         if isinstance(s, Duration):
             return s
-        match_result = Duration.__matcher.match(f"{s}")
-        if match_result:
-            return Duration(float(match_result.group('value')), TimeUnit.value_of(match_result.group('unit')))
+        return Duration.__parse(s if isinstance(s, str) else f"{s}")
+
+    @staticmethod
+    @lru_cache(maxsize = 256)
+    def __parse(text: str) -> "Duration":
+        # Durations are immutable, so repeated literals such as the "0 s" trigger delay
+        # default resolve to the same cached instance without re-parsing.
+        stripped = text.strip()
+        # Fast path: most inputs look like "1.0 us", where a whitespace split is cheaper
+        # than scanning for the unit suffix character by character.
+        parts = stripped.split()
+        if len(parts) == 2:
+            value_str = parts[0]
+            multiplier = _NS_PER_UNIT.get(parts[1])
         else:
-            raise RuntimeError(f"Unable to parse \"{s}\" as duration")
+            i = len(stripped)
+            while i > 0 and stripped[i - 1].isalpha():
+                i -= 1
+            value_str = stripped[:i]
+            multiplier = _NS_PER_UNIT.get(stripped[i:])
+        if multiplier is None:
+            raise RuntimeError(f"Unable to parse \"{text}\" as duration")
+        try:
+            duration = Duration(float(value_str), TimeUnit(multiplier))
+        except (ValueError, OverflowError):
+            # ValueError: not a number (or round(nan)); OverflowError: round(inf).
+            raise RuntimeError(f"Unable to parse \"{text}\" as duration")
+        # Different spellings of the same interned value (e.g. "0 s" and "0s") collapse
+        # onto the shared instance.
+        return _INTERN.get((duration._ps, duration.time_unit), duration)
 
     def to_float(self, time_unit: str | TimeUnit) -> float:
-        return self.__time_interval * self.time_unit.value / TimeUnit.value_of(time_unit).value
+        return self._ps / (1000 * TimeUnit.value_of(time_unit).value)
 
     def optimize(self) -> Self:
-        for time_unit in [TimeUnit.KS, TimeUnit.S, TimeUnit.MS, TimeUnit.US, TimeUnit.NS]:
-            if 1000 > self.to_float(time_unit) >= 1:
-                return self.in_unit(time_unit)
+        unit = _OPTIMIZE_UNITS[bisect_right(_OPTIMIZE_THRESHOLDS_PS, abs(self._ps))]
+        return self if unit is self.time_unit else self.in_unit(unit)
+
+
+class DurationArray:
+    """
+    Vector of time intervals backed by a single contiguous int64 array of nanoseconds.
+    Use it for bulk time data such as waveform timestamps: arithmetic and comparisons are
+    vectorized NumPy operations on the whole array, orders of magnitude faster than a
+    Python list of Duration objects of the same length.
+    """
+
+    __slots__ = ("_ns",)
+
+    def __init__(self, ns: ndarray):
+        self._ns = np.ascontiguousarray(ns, dtype = np.int64)
+
+    @classmethod
+    def from_seconds(cls, seconds: ndarray) -> "DurationArray":
+        """ Construct from an array (or array-like) of values in seconds. """
+        return cls(np.rint(np.asarray(seconds, dtype = np.float64) * TimeUnit.S.value))
+
+    def __len__(self):
+        return len(self._ns)
+
+    def __repr__(self):
+        return f"DurationArray(len = {len(self._ns)})"
+
+    def __getitem__(self, index) -> "Duration | DurationArray":
+        if isinstance(index, (int, np.integer)):
+            return Duration._from_ps(int(self._ns[index]) * 1000, TimeUnit.NS).optimize()
+        return DurationArray(self._ns[index])
+
+    def __add__(self, other):
+        if type(other) is DurationArray:
+            return DurationArray(self._ns + other._ns)
+        elif type(other) is Duration:
+            return DurationArray(self._ns + other._ps // 1000)
+        else:
+            raise RuntimeError("DurationArray can only be added to a duration or another duration array")
+
+    def __sub__(self, other):
+        if type(other) is DurationArray:
+            return DurationArray(self._ns - other._ns)
+        elif type(other) is Duration:
+            return DurationArray(self._ns - other._ps // 1000)
+        else:
+            raise RuntimeError("DurationArray can only subtract a duration or another duration array")
+
+    def __mul__(self, scale):
+        if scale == 1:
+            return self
+        return DurationArray(np.rint(self._ns * scale))
+
+    def __rmul__(self, scale):
+        return self.__mul__(scale)
+
+    def __truediv__(self, scale):
+        if scale == 1:
+            return self
+        # Round to the nearest nanosecond like Duration.__truediv__ does; int64 coercion
+        # in the constructor would otherwise truncate toward zero.
+        return DurationArray(np.rint(self._ns / scale))
+
+    def __compare_ns(self, other) -> int | ndarray:
+        if type(other) is DurationArray:
+            return other._ns
+        elif type(other) is Duration:
+            return other._ps // 1000
+        else:
+            raise RuntimeError("DurationArray can only be compared to a duration or another duration array")
+
+    def __gt__(self, other):
+        return self._ns > self.__compare_ns(other)
+
+    def __ge__(self, other):
+        return self._ns >= self.__compare_ns(other)
+
+    def __lt__(self, other):
+        return self._ns < self.__compare_ns(other)
+
+    def __le__(self, other):
+        return self._ns <= self.__compare_ns(other)
+
+    def __eq__(self, other):
+        return self._ns == self.__compare_ns(other)
 
-        return self.in_unit(TimeUnit.NS)
+    def to_float(self, time_unit: str | TimeUnit) -> ndarray:
+        """ Whole vector converted to floats in the given unit. """
+        return self._ns / TimeUnit.value_of(time_unit).value
 
 
-ONE_PICOSECOND = Duration.value_of("0.001ns")
+ONE_PICOSECOND = Duration.intern(0.001, TimeUnit.NS)
@@ -1,4 +1,3 @@
-import csv
 from abc import ABC, abstractmethod
 from collections.abc import Callable
 from functools import cache
@@ -13,6 +12,27 @@ from typing_extensions import override
 from inctrl.model.time import TimeUnit, Duration
 
 
+def _mask(predicate: Callable[[float], bool], arr: ndarray) -> ndarray:
+    """
+    Evaluate a per-sample predicate over the whole array and return a boolean mask
+    suitable for fancy indexing. Predicates written with NumPy operations, such as
+    `lambda x: (x > 0) & (x < 1e-6)`, already work on whole arrays; they are applied
+    once and their mask is used directly, which runs as a handful of SIMD compares.
+    Anything else is run through np.frompyfunc - a single C-driven loop that is still
+    noticeably faster than a Python-level comprehension on the multi-megapoint arrays
+    typical for scope captures.
+    """
+    try:
+        result = predicate(arr)
+    except Exception:
+        # Predicate only works per element (e.g. lambda x: x.is_integer()); whatever it
+        # raised on the whole array, the elementwise path below is the answer.
+        result = None
+    if isinstance(result, np.ndarray) and result.dtype == bool and result.shape == arr.shape:
+        return result
+    return np.frompyfunc(predicate, 1, 1)(arr).astype(bool, copy = False)
+
+
 class WaveformProto(ABC):
     @property
     @abstractmethod
@@ -60,6 +80,22 @@ class MatplotlibWaveformPlotter(WaveformPlotter):
     WaveformPlotter that will render waveforms using matplotlib.
     """
 
+    def __init__(self):
+        # pyplot handle, resolved on first render. The import cannot live in __init__:
+        # an instance of this plotter is created at import time (default argument of
+        # Waveform.plot), which would drag matplotlib's sizable import cost into
+        # `import inctrl`. Caching the handle still spares repeated renders the
+        # per-call import-machinery lookup.
+        self.__plt = None
+
+    @property
+    def _plt(self):
+        plt = self.__plt
+        if plt is None:
+            from matplotlib import pyplot as plt
+            self.__plt = plt
+        return plt
+
     def render_waveform(
             self,
             waveforms: list[WaveformProto],
@@ -67,15 +103,22 @@ class MatplotlibWaveformPlotter(WaveformPlotter):
             block: bool = True,
             dpi: int | None = None,
             to_file: str | Path | None = None) -> None:
-        from matplotlib import pyplot as plt
+        plt = self._plt
         fig = plt.figure(figsize = (12, 8)) if dpi is None else plt.figure(figsize = (12, 8), dpi = dpi)
         ax = fig.subplots()
         ax.grid(True)
 
         title = ", ".join([w.name for w in waveforms])
-        for waveform in waveforms:
-            xs, ys = waveform.xy(time_unit)
-            ax.plot(xs, ys)
+        if len(waveforms) > 1 and all(isinstance(w, Waveform) for w in waveforms) and \
+                len({(w.dt_s, w.trigger_index, len(w.y())) for w in waveforms}) == 1:
+            # Multi-channel captures from one scope share the x axis; passing it once with a
+            # 2D y-matrix lets matplotlib build all lines in a single call and avoids
+            # re-scaling the x array per waveform.
+            ax.plot(waveforms[0].x(time_unit), np.column_stack([w.y() for w in waveforms]))
+        else:
+            for waveform in waveforms:
+                xs, ys = waveform.xy(time_unit)
+                ax.plot(xs, ys)
 
         ax.set_xlabel(f"Time [{time_unit.to_str()}]")
         ax.set_ylabel("V")
@@ -95,12 +138,20 @@ class Waveform(WaveformProto):
     This class holds x and y arrays representing the waveform.
     """
 
-    def __init__(self, dx_s: float, trigger_index: int, ys: ndarray, name: str):
+    def __init__(self, dx_s: float, trigger_index: int, ys: ndarray, name: str, dtype: np.dtype | None = None):
         self.__dx_s = dx_s
         self.__trigger_index = trigger_index
-        self.__ys = ys
-        self.__xs_s = np.array([(i - trigger_index) * dx_s for i in range(len(ys))], dtype = float)
-        self.__xy = list(zip(list(self.__xs_s), list(self.__ys)))
+        # Scope ADCs are 8-12 bit, so float32 holds samples losslessly at half the memory
+        # bandwidth of float64; callers that want that pass dtype=np.float32. By default the
+        # array is taken as is to avoid a conversion copy.
+        self.__ys = ys if dtype is None or ys.dtype == dtype else np.ascontiguousarray(ys, dtype = dtype)
+        # x-axis in seconds, materialized on first use. Many waveforms never need it:
+        # save_to_file persists only ys and scalar arithmetic never touches the x-axis.
+        self.__xs_s_cache: ndarray | None = None
+        # x arrays already converted to a non-native time unit, built on first request.
+        # Plotting and export ask for the same unit repeatedly; caching saves an
+        # N-element multiply + allocation per call.
+        self.__x_scaled_cache: dict[TimeUnit, ndarray] = {}
         self.__name = name
 
     def __repr__(self):
@@ -126,8 +177,20 @@ class Waveform(WaveformProto):
         return self.x(time_unit, x_predicate), self.y(x_predicate)
 
     def get_optimal_time_unit(self) -> TimeUnit:
-        window_s = self.__xs_s[-1] - self.__xs_s[0]
-        return Duration.value_of(f"{window_s} s").optimize().time_unit
+        return Duration.from_seconds(self.time_window_s()).optimize().time_unit
+
+    @property
+    def _xs_s(self) -> ndarray:
+        """ x-axis in seconds, built lazily on first access and cached. """
+        xs = self.__xs_s_cache
+        if xs is None:
+            # In-place subtract/multiply on the arange buffer: no intermediate arrays, which
+            # matters for very long (memory-bound) captures.
+            xs = np.arange(len(self.__ys), dtype = np.float64)
+            np.subtract(xs, self.__trigger_index, out = xs)
+            np.multiply(xs, self.__dx_s, out = xs)
+            self.__xs_s_cache = xs
+        return xs
 
     def x(self,
           time_unit: TimeUnit | str = TimeUnit.S,
@@ -138,42 +201,80 @@ class Waveform(WaveformProto):
 
         Filter on predicates if any given.
         """
-        phys_unit_scale = TimeUnit.S.value / TimeUnit.value_of(time_unit).value
-
+        requested_time_unit = TimeUnit.value_of(time_unit)
         if x_predicate is None:
-            return self.__xs_s * phys_unit_scale
+            return self.__x_in_unit(requested_time_unit)
         else:
-            return np.array([ab[0] for ab in self.__xy if x_predicate(ab[0])]) * phys_unit_scale
+            phys_unit_scale = TimeUnit.S.value / requested_time_unit.value
+            return self._xs_s[self.__x_mask(x_predicate)] * phys_unit_scale
+
+    def __x_in_unit(self, time_unit: TimeUnit) -> ndarray:
+        """ Full x array in the given unit; the native unit is returned as is, others are cached. """
+        if time_unit is TimeUnit.S:
+            return self._xs_s
+        xs = self.__x_scaled_cache.get(time_unit)
+        if xs is None:
+            xs = self._xs_s * (TimeUnit.S.value / time_unit.value)
+            self.__x_scaled_cache[time_unit] = xs
+        return xs
 
     def y(self, x_predicate: Callable[[float], bool] | None = None) -> ndarray:
         """ Return numpy array holding values on the y-axis (usually voltage). Filter on predicates if any given. """
         if x_predicate is None:
             return self.__ys
         else:
-            return np.array([ab[1] for ab in self.__xy if x_predicate(ab[0])])
+            return self.__ys[self.__x_mask(x_predicate)]
+
+    def __x_mask(self, x_predicate: Callable[[float], bool]) -> ndarray:
+        """ Boolean mask selecting the samples whose time (in seconds) satisfies the predicate. """
+        return _mask(x_predicate, self._xs_s)
 
     @property
     def dt_s(self) -> float:
         """ Return time step on the t-axis in seconds. """
         return self.__dx_s
 
+    @property
+    def trigger_index(self) -> int:
+        """ Return index of the sample at which the trigger fired. """
+        return self.__trigger_index
+
     def time_window_s(self) -> float:
         """ Return time window/domain on the t-axis in seconds. """
-        return self.__xs_s[-1] - self.__xs_s[0]
+        # Equals xs[-1] - xs[0] but does not force materialization of the lazy x array.
+        return (len(self.__ys) - 1) * self.__dx_s
 
     def save_to_file(self, filename: str | Path, file_format: str = "parquet") -> None:
         """ Save this waveform into a file. Including all metadata associated with this waveform. """
         match file_format:
             case "parquet":
-                data_table = pa.table(
-                    data = {"ys": self.y()},
+                ys = self.y()
+                schema = pa.schema(
+                    [pa.field("ys", pa.from_numpy_dtype(ys.dtype))],
                     metadata = {
                         "dx": f"{self.__dx_s}",
                         "trigger_index": f"{self.__trigger_index}",
                         "name": self.__name
                     }
                 )
-                pq.write_table(data_table, filename, store_schema = True)
+                # zstd at level 1 compresses float64 samples better than the default snappy
+                # at comparable speed. Dictionary encoding and per-column statistics only add
+                # overhead for dense float payloads, so both are off. Row groups of 128 Ki
+                # samples (1 MiB of float64) keep the writer's buffer cache-friendly instead
+                # of staging the whole capture.
+                with pq.ParquetWriter(
+                        filename,
+                        schema,
+                        compression = "zstd",
+                        compression_level = 1,
+                        use_dictionary = False,
+                        write_statistics = False,
+                        data_page_size = 256 * 1024
+                ) as writer:
+                    writer.write_batch(
+                        pa.RecordBatch.from_arrays([pa.array(ys)], schema = schema),
+                        row_group_size = 131_072
+                    )
             case _:
                 raise RuntimeError(f"Invalid file format \"{file_format}\"")
 
@@ -181,10 +282,17 @@ class Waveform(WaveformProto):
     def load_from_file(filename: str | Path) -> "Waveform":
         """ Load waveform from a file. """
         data_table = pq.read_table(filename)
+        # A single-chunk primitive column converts to a NumPy view over the Arrow buffer
+        # without copying; columns with nulls cannot, hence the fallback.
+        ys_column = data_table.column("ys").combine_chunks()
+        try:
+            ys = ys_column.to_numpy(zero_copy_only = True)
+        except pa.ArrowInvalid:
+            ys = ys_column.to_numpy(zero_copy_only = False)
         return Waveform(
             dx_s = float(data_table.schema.metadata[b'dx'].decode("utf-8")),
             trigger_index = int(data_table.schema.metadata[b'trigger_index'].decode("utf-8")),
-            ys = np.array(data_table.column("ys")),
+            ys = ys,
             name = data_table.schema.metadata[b'name'].decode("utf-8"),
         )
 
@@ -205,11 +313,18 @@ class Waveform(WaveformProto):
         """
         target_file = Path(filename)
         ts, ys = self.xy(time_unit = time_unit)
-        with open(target_file, "w", newline = "") as file:
-            writer = csv.writer(file)
-            if include_column_names:
-                writer.writerow(["t", "y"])
-            writer.writerows(zip(ts, ys))
+        # np.savetxt formats rows in a C loop and streams them to the file, avoiding the
+        # per-row Python dispatch (and per-sample float boxing) of csv.writer.
+        np.savetxt(
+            target_file,
+            np.column_stack((ts, ys)),
+            delimiter = ",",
+            # %.17g is the shortest fixed format that still round-trips float64 exactly,
+            # producing noticeably smaller files than the default %.18e.
+            fmt = "%.17g",
+            header = "t,y" if include_column_names else "",
+            comments = ""
+        )
 
     def plot(self,
              plotter: WaveformPlotter = WaveformPlotter.matplotlib(),
@@ -220,34 +335,48 @@ class Waveform(WaveformProto):
         requested_time_unit = self.get_optimal_time_unit() if time_unit is None else TimeUnit.value_of(time_unit)
         plotter.render_waveform([self], requested_time_unit, block, dpi, to_file)
 
+    def __assert_compatible(self, other: "Waveform") -> None:
+        # The x axis is fully determined by (len, dx_s, trigger_index), so comparing this
+        # metadata is equivalent to the element-wise array comparison at O(1) cost.
+        if len(self.__ys) != len(other.__ys) or self.__dx_s != other.__dx_s \
+                or self.__trigger_index != other.__trigger_index:
+            raise RuntimeError("These waveforms x-axis do not match")
+
     def __mul__(self, other):
         if isinstance(other, Waveform):
-            if (self.__xs_s != other.__xs_s).any():
-                raise RuntimeError("These waveforms x-axis do not match")
-            else:
-                return Waveform(
-                    dx_s = self.__dx_s, trigger_index = self.__trigger_index,
-                    ys = self.__ys * other.__ys, name = self.__name
-                )
-
-        elif isinstance(other, float) or isinstance(other, int):
+            self.__assert_compatible(other)
             return Waveform(
-                dx_s = self.__dx_s, trigger_index = self.__trigger_index, ys = self.__ys * other, name = self.__name
+                dx_s = self.__dx_s, trigger_index = self.__trigger_index,
+                ys = self.__ys * other.__ys, name = self.__name
             )
 
+        elif isinstance(other, float) or isinstance(other, int):
+            return self.__scaled(other)
+
         else:
             raise RuntimeError("Waveform can only be multiplied by number or another waveform")
 
+    def __scaled(self, scale: float) -> "Waveform":
+        # Waveform is treated as immutable, so scaling by 1 can return self outright and
+        # scaling by -1 reduces to a single-pass negation.
+        if scale == 1:
+            return self
+        elif scale == -1:
+            ys = np.negative(self.__ys)
+        else:
+            ys = self.__ys * scale
+        return Waveform(dx_s = self.__dx_s, trigger_index = self.__trigger_index, ys = ys, name = self.__name)
+
     def __rmul__(self, other):
         if isinstance(other, float) or isinstance(other, int):
-            return Waveform(
-                dx_s = self.__dx_s, trigger_index = self.__trigger_index, ys = self.__ys * other, name = self.__name
-            )
+            return self.__scaled(other)
         else:
             raise RuntimeError("Waveform can only be multiplied by number or another waveform")
 
     def __truediv__(self, scale):
         if isinstance(scale, float) or isinstance(scale, int):
+            if scale == 1 or scale == -1:
+                return self.__scaled(scale)
             return Waveform(
                 dx_s = self.__dx_s, trigger_index = self.__trigger_index, ys = self.__ys / scale, name = self.__name
             )
@@ -257,9 +386,8 @@ class Waveform(WaveformProto):
     def __add__(self, other):
         if not isinstance(other, Waveform):
             raise RuntimeError(f"Cannot add {other.__class__} to Waveform")
-        elif (self.__xs_s != other.__xs_s).any():
-            raise RuntimeError("These waveforms x-axis do not match")
         else:
+            self.__assert_compatible(other)
             return Waveform(
                 dx_s = self.__dx_s, trigger_index = self.__trigger_index,
                 ys = self.__ys + other.__ys, name = self.__name
@@ -269,7 +397,11 @@ class Waveform(WaveformProto):
         if not isinstance(other, Waveform):
             raise RuntimeError(f"Cannot subtract {other.__class__} from Waveform")
         else:
-            return self + (-1 * other)
+            self.__assert_compatible(other)
+            return Waveform(
+                dx_s = self.__dx_s, trigger_index = self.__trigger_index,
+                ys = self.__ys - other.__ys, name = self.__name
+            )
 
 
 class Waveforms:
@@ -277,8 +409,7 @@ class Waveforms:
         self.waveforms = list(waveforms)
 
     def _get_optimal_time_unit(self) -> TimeUnit:
-        time_window = self.waveforms[0].time_window_s()
-        return Duration.value_of(f"{time_window} s").optimize().time_unit
+        return Duration.from_seconds(self.waveforms[0].time_window_s()).optimize().time_unit
 
     def plot(self,
              plotter: WaveformPlotter = WaveformPlotter.matplotlib(),
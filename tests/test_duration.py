@@ -1,6 +1,7 @@
+import numpy as np
 import pytest
 
-from inctrl import Duration, TimeUnit
+from inctrl import Duration, DurationArray, TimeUnit
 
 
 def test_duration_instantiation():
@@ -83,3 +84,71 @@ def test_duration_optimize():
     assert Duration.value_of("1002ns").optimize().time_unit == TimeUnit.US
     assert Duration.value_of("999ns").optimize().time_unit == TimeUnit.NS
     assert Duration.value_of("1002ns").optimize() == Duration.value_of("0.001002 ms")
+
+    # unit boundaries, sign and out-of-range magnitudes
+    assert Duration.value_of("1000 ns").optimize().time_unit == TimeUnit.US
+    assert Duration.value_of("-1002 ns").optimize().time_unit == TimeUnit.US
+    assert Duration.value_of("0 s").optimize().time_unit == TimeUnit.NS
+    assert Duration.value_of("0.001 ns").optimize().time_unit == TimeUnit.NS
+    assert Duration.value_of("5000 ks").optimize().time_unit == TimeUnit.KS
+
+
+def test_duration_hash():
+    # equal durations expressed in different units must hash the same
+    assert hash(Duration.value_of("1s")) == hash(Duration.value_of("1000 ms"))
+    durations = {Duration.value_of("1s"): "one second"}
+    assert durations[Duration.value_of("1000 ms")] == "one second"
+
+
+def test_duration_from_seconds():
+    assert Duration.from_seconds(0.5) == Duration.value_of("500 ms")
+    assert Duration.from_seconds(0) == Duration.value_of("0 s")
+    assert Duration.from_seconds(1.5).to_float("ms") == 1500
+
+
+def test_duration_intern():
+    assert Duration.intern(1, TimeUnit.MS) is Duration.intern(1, TimeUnit.MS)
+    assert Duration.intern(1, TimeUnit.MS) == Duration.value_of("1 ms")
+
+
+def test_duration_array_indexing():
+    xs = DurationArray.from_seconds(np.array([1e-9, 2e-9, 3e-9]))
+    assert len(xs) == 3
+
+    # both python and numpy integer indexes yield a Duration
+    assert xs[1] == Duration.value_of("2 ns")
+    assert xs[np.int64(1)] == Duration.value_of("2 ns")
+
+    # slicing yields another DurationArray
+    tail = xs[1:]
+    assert isinstance(tail, DurationArray)
+    assert len(tail) == 2
+    assert tail[0] == Duration.value_of("2 ns")
+
+
+def test_duration_array_math_ops():
+    xs = DurationArray.from_seconds(np.array([1e-9, 2e-9, 3e-9]))
+    assert ((xs + Duration.value_of("1 ns")).to_float("ns") == [2, 3, 4]).all()
+    assert ((xs - Duration.value_of("1 ns")).to_float("ns") == [0, 1, 2]).all()
+    assert ((xs + xs).to_float("ns") == [2, 4, 6]).all()
+    assert ((xs - xs).to_float("ns") == [0, 0, 0]).all()
+    assert ((xs * 2).to_float("ns") == [2, 4, 6]).all()
+    assert ((3 * xs).to_float("ns") == [3, 6, 9]).all()
+
+    # division rounds to the nearest nanosecond instead of truncating toward zero
+    assert ((xs / 3).to_float("ns") == [0, 1, 1]).all()
+
+    with pytest.raises(Exception):
+        xs + 1
+    with pytest.raises(Exception):
+        xs - "1 ns"
+
+
+def test_duration_array_comparison():
+    xs = DurationArray.from_seconds(np.array([1e-9, 2e-9, 3e-9]))
+    assert ((xs > Duration.value_of("1 ns")) == [False, True, True]).all()
+    assert ((xs <= Duration.value_of("2 ns")) == [True, True, False]).all()
+    assert ((xs == DurationArray.from_seconds(np.array([1e-9, 0, 3e-9]))) == [True, False, True]).all()
+
+    with pytest.raises(Exception):
+        xs > 1